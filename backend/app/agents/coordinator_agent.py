@@ -24,20 +24,21 @@ class CoordinatorAgent:
         # 2. Bulk Predict Risk (Optimization)
         # It's faster to predict in bulk if model allows, but for clarity/error handling 
         # inside agents, we'll iterate or batch.
-        # RiskAgent.predict_risk takes the whole dataframe.
+        # RiskAgent.predict_batch takes the whole dataframe and stays columnar.
         try:
-            risk_results = RiskAgent.predict_risk(df)
+            risk_batch = RiskAgent.predict_batch(df)
         except Exception as e:
             logger.error(f"Batch prediction failing, attempting row-by-row or aborting: {e}")
             raise e
+        risk_probs = risk_batch.probabilities
+        risk_labels = risk_batch.labels
 
         # 3. Iterate and Coordinate
-        for idx, row in df.iterrows():
+        for pos, (idx, row) in enumerate(df.iterrows()):
             try:
-                # Merge logic
-                risk_data = risk_results[idx]
-                risk_prob = risk_data['probability']
-                risk_label = risk_data['risk_label']
+                # Merge logic (positional, so non-RangeIndex frames line up)
+                risk_prob = risk_probs[pos]
+                risk_label = risk_labels[pos]
                 
                 # Calculate Impact
                 impact_data = ImpactAgent.calculate_impact(row, global_maxima)
@@ -52,7 +53,7 @@ class CoordinatorAgent:
                 # Only compute SHAP for High/Medium risk to save time? 
                 # User asked for "GET /employees/{id} ... Human-readable summary"
                 # We can compute it lazily or pre-compute. for usage simplicity, let's pre-compute.
-                reasons = SHAPAgent.explain_risk(df, idx)
+                reasons = SHAPAgent.explain_risk(df, pos)
                 
                 # Construct Employee Result
                 employee_result = {
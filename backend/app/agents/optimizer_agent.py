@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+import logging
+from itertools import product
+from .risk_agent import RiskAgent, RISK_LABELS
+from .simulator_agent import SimulatorAgent
+
+logger = logging.getLogger(__name__)
+
+class OptimizerAgent:
+    # Default annual cost per employee of each non-salary action
+    DEFAULT_ACTION_COSTS = {"Promotion": 6000.0, "RemoteWork": 500.0, "Training": 2000.0}
+    DEFAULT_RAISE_LEVELS = [0, 5, 10, 15, 20]
+
+    @staticmethod
+    def optimize_budget(employees, budget: float, raise_levels=None, action_costs: dict = None,
+                        min_priority: float = 0.0, department: str = None) -> dict:
+        """
+        Allocates a retention budget across the workforce to minimise expected
+        high-impact attrition: sum(probability * ImpactScore / 100).
+
+        Every employee gets at most one option (a raise level combined with any
+        of Promotion/RemoteWork/Training). Option effects use SimulatorAgent's
+        retention multipliers on the current probability, so no model calls.
+        The multiple-choice knapsack is solved with a vectorised Lagrangian
+        relaxation (binary search on the price of a dollar), then leftover
+        budget is spent greedily on the best remaining upgrades.
+        """
+        if raise_levels is None:
+            raise_levels = OptimizerAgent.DEFAULT_RAISE_LEVELS
+        # An empty list means "no raises": only the 0% level remains
+        raise_levels = sorted(set(raise_levels) | {0})
+        costs = {**OptimizerAgent.DEFAULT_ACTION_COSTS, **(action_costs or {})}
+
+        # 1. Columnar view of the workforce
+        employees = [e for e in employees if department is None or e.get('Department') == department]
+        ids = np.array([e['EmployeeID'] for e in employees], dtype=object)
+        depts = np.array([str(e.get('Department', 'Unknown')) for e in employees], dtype=object)
+        prob = np.array([e['Risk']['Probability'] for e in employees], dtype=float)
+        weight = np.array([e['Impact']['score'] for e in employees], dtype=float) / 100.0
+        priority = np.array([e['PriorityScore'] for e in employees], dtype=float)
+        income = np.array([e.get('RawData', {}).get('MonthlyIncome', 0) or 0 for e in employees], dtype=float)
+        income = np.nan_to_num(income, nan=0.0)
+        eligible = priority >= min_priority
+
+        # 2. Option grid (K options, identical for every employee)
+        action_names = list(SimulatorAgent.ACTION_MULTIPLIERS)
+        options = [
+            (pct, dict(zip(action_names, flags)))
+            for pct, flags in product(raise_levels, product([False, True], repeat=len(action_names)))
+        ]
+        pcts = np.array([pct for pct, _ in options], dtype=float)
+        multipliers = SimulatorAgent.salary_multiplier(pcts) * np.array(
+            [SimulatorAgent.action_multiplier(actions) for _, actions in options])
+        fixed_cost = np.array([sum(costs[a] for a, on in actions.items() if on) for _, actions in options])
+
+        # 3. Benefit / cost matrices, shape (n_employees, K). Option 0 = do nothing.
+        new_prob = np.minimum(prob[:, None], np.clip(prob[:, None] * multipliers[None, :], 0.01, 0.99))
+        benefit = (prob[:, None] - new_prob) * weight[:, None]
+        cost = income[:, None] * 12 * pcts[None, :] / 100 + fixed_cost[None, :]
+        benefit[~eligible] = 0.0
+        # No known income (upload fills missing values with 0): a raise has no
+        # meaningful cost, so raise options are ruled out rather than free
+        no_income = income <= 0
+        raise_options = pcts > 0
+        benefit[np.ix_(no_income, raise_options)] = 0.0
+        cost[np.ix_(no_income, raise_options)] = np.inf
+        # Option 0 (no raise, no actions) is the do-nothing baseline
+        benefit[:, 0] = 0.0
+        cost[:, 0] = 0.0
+
+        choice = OptimizerAgent._allocate(benefit, cost, budget)
+
+        rows = np.arange(len(ids))
+        chosen_cost = cost[rows, choice]
+        chosen_benefit = benefit[rows, choice]
+        chosen_prob = new_prob[rows, choice]
+        targeted = np.flatnonzero(choice > 0)
+        targeted = targeted[np.argsort(-priority[targeted], kind='stable')]
+
+        new_labels = RISK_LABELS[RiskAgent.label_codes(chosen_prob)]
+        old_labels = RISK_LABELS[RiskAgent.label_codes(prob)]
+        recommendations = [
+            {
+                "EmployeeID": ids[i],
+                "Department": depts[i],
+                "PriorityScore": float(priority[i]),
+                "current_risk": old_labels[i],
+                "current_probability": round(float(prob[i]), 4),
+                "new_risk": new_labels[i],
+                "new_probability": round(float(chosen_prob[i]), 4),
+                "actions": {"RaisePct": float(pcts[choice[i]]), **options[choice[i]][1]},
+                "annual_cost": round(float(chosen_cost[i]), 2),
+                "expected_reduction": round(float(chosen_benefit[i]), 4),
+            }
+            for i in targeted
+        ]
+
+        by_dept = pd.DataFrame({
+            "department": depts[targeted], "cost": chosen_cost[targeted], "reduction": chosen_benefit[targeted]
+        }).groupby("department").agg(employees=("cost", "size"), annual_cost=("cost", "sum"),
+                                      expected_reduction=("reduction", "sum"))
+
+        before = float((prob * weight).sum())
+        return {
+            "budget": budget,
+            "total_cost": round(float(chosen_cost.sum()), 2),
+            "expected_attrition_before": round(before, 2),
+            "expected_attrition_after": round(before - float(chosen_benefit.sum()), 2),
+            "employees_targeted": int(len(targeted)),
+            "departments": {
+                d: {"employees": int(r.employees), "annual_cost": round(float(r.annual_cost), 2),
+                    "expected_reduction": round(float(r.expected_reduction), 4)}
+                for d, r in by_dept.iterrows()
+            },
+            "recommendations": recommendations,
+        }
+
+    @staticmethod
+    def _allocate(benefit: np.ndarray, cost: np.ndarray, budget: float, iterations: int = 50) -> np.ndarray:
+        """
+        Picks one option per row maximising total benefit with total cost <= budget.
+        Returns the chosen option index per row.
+        """
+        if benefit.size == 0:
+            return np.zeros(len(benefit), dtype=int)
+
+        def pick(lam):
+            if lam == 0:
+                # Budget is no constraint: best benefit, cheapest option among ties
+                best = benefit.max(axis=1, keepdims=True)
+                return np.argmin(np.where(benefit >= best - 1e-12, cost, np.inf), axis=1)
+            return np.argmax(benefit - lam * cost, axis=1)
+
+        def spend(choice):
+            return cost[np.arange(len(choice)), choice].sum()
+
+        # Price per dollar: at `hi` nothing is worth buying, at `lo` = 0 everything useful is
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.where(cost > 0, benefit / cost, 0.0)
+        lo, hi = 0.0, float(ratios.max()) + 1e-12
+        choice = pick(lo)
+        if spend(choice) <= budget:
+            return choice
+
+        for _ in range(iterations):
+            mid = (lo + hi) / 2
+            if spend(pick(mid)) > budget:
+                lo = mid
+            else:
+                hi = mid
+        choice = pick(hi)
+
+        # Spend what is left on the upgrades the slightly cheaper price would have bought
+        upgrade = pick(lo)
+        rows = np.arange(len(choice))
+        extra_cost = cost[rows, upgrade] - cost[rows, choice]
+        extra_benefit = benefit[rows, upgrade] - benefit[rows, choice]
+        candidates = np.flatnonzero((upgrade != choice) & (extra_cost > 0) & (extra_benefit > 0))
+        if len(candidates):
+            order = candidates[np.argsort(-(extra_benefit[candidates] / extra_cost[candidates]))]
+            fits = np.cumsum(extra_cost[order]) <= budget - spend(choice)
+            take = order[fits]
+            choice[take] = upgrade[take]
+        return choice
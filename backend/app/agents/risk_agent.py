@@ -1,7 +1,9 @@
 import pandas as pd
+import numpy as np
 import joblib
 import os
 import logging
+from dataclasses import dataclass
 
 import logging
 import sklearn.compose 
@@ -21,6 +23,61 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# --- RISK THRESHOLDS ---
+# Single source of truth for risk labelling (RiskAgent, SimulatorAgent, ...).
+# A probability >= MEDIUM is "Medium Risk", >= HIGH is "High Risk".
+# Override per deployment via RISK_MEDIUM_THRESHOLD / RISK_HIGH_THRESHOLD.
+def validate_thresholds(thresholds) -> np.ndarray:
+    """
+    np.searchsorted needs strictly increasing cut-offs; fail loudly instead of mislabelling.
+    """
+    thresholds = np.asarray(thresholds, dtype=float)
+    if not (np.all((thresholds >= 0) & (thresholds <= 1)) and np.all(np.diff(thresholds) > 0)):
+        raise ValueError(
+            f"Invalid risk thresholds {thresholds.tolist()}: RISK_MEDIUM_THRESHOLD must be "
+            f"below RISK_HIGH_THRESHOLD and both within [0, 1]"
+        )
+    return thresholds
+
+RISK_THRESHOLDS = validate_thresholds([
+    float(os.getenv("RISK_MEDIUM_THRESHOLD", 0.4)),
+    float(os.getenv("RISK_HIGH_THRESHOLD", 0.7)),
+])
+# Label codes index into this array: 0 = Low, 1 = Medium, 2 = High
+RISK_LABELS = np.array(["Low Risk", "Medium Risk", "High Risk"], dtype=object)
+LOW_RISK, MEDIUM_RISK, HIGH_RISK = 0, 1, 2
+
+
+@dataclass(frozen=True, eq=False)
+class RiskBatch:
+    """
+    Columnar prediction result: one probability and one label code per row.
+    Avoids materialising a dict per employee; use `labels` or `to_records()`
+    only at the edges where strings/dicts are actually needed.
+    Compares by identity (a generated __eq__ over ndarrays would raise);
+    compare `probabilities` / `codes` with numpy when needed.
+    """
+    probabilities: np.ndarray
+    codes: np.ndarray
+
+    @classmethod
+    def from_probabilities(cls, probs) -> "RiskBatch":
+        probs = np.asarray(probs, dtype=float)
+        return cls(probabilities=probs, codes=RiskAgent.label_codes(probs))
+
+    @property
+    def labels(self) -> np.ndarray:
+        return RISK_LABELS[self.codes]
+
+    def __len__(self):
+        return len(self.probabilities)
+
+    def to_records(self) -> list:
+        return [
+            {"probability": prob, "risk_label": label}
+            for prob, label in zip(self.probabilities, self.labels)
+        ]
+
 class RiskAgent:
     _model = None
 
@@ -43,24 +100,42 @@ class RiskAgent:
         return cls._model
 
     @staticmethod
-    def predict_risk(data: pd.DataFrame):
+    def feature_names():
+        """
+        Input columns the model was fitted on, or None if it does not record them.
+        """
+        try:
+            model = RiskAgent.load_model()
+        except Exception:
+            return None
+        names = getattr(model, 'feature_names_in_', None)
+        return list(names) if names is not None else None
+
+    @staticmethod
+    def label_codes(probs) -> np.ndarray:
+        """
+        Maps probabilities to label codes (0/1/2) against RISK_THRESHOLDS.
+        """
+        # side='right' so a probability equal to a threshold falls in the upper band
+        return np.searchsorted(RISK_THRESHOLDS, probs, side='right').astype(np.int8)
+
+    @staticmethod
+    def label_for(prob: float) -> str:
+        return RISK_LABELS[RiskAgent.label_codes(prob)]
+
+    @staticmethod
+    def predict_batch(data: pd.DataFrame) -> RiskBatch:
         try:
             model = RiskAgent.load_model()
             # Predict probability (class 1 is attrition)
             # Assumption: model.predict_proba returns [n_samples, 2] array
             probs = model.predict_proba(data)[:, 1]
-            
-            results = []
-            for prob in probs:
-                if prob >= 0.7:
-                    label = "High Risk"
-                elif prob >= 0.4:
-                    label = "Medium Risk"
-                else:
-                    label = "Low Risk"
-                results.append({"probability": prob, "risk_label": label})
-            
-            return results
+            return RiskBatch.from_probabilities(probs)
         except Exception as e:
             logger.error(f"Prediction failed: {e}")
             raise e
+
+    @staticmethod
+    def predict_risk(data: pd.DataFrame):
+        # Row-oriented view kept for callers that want one dict per employee
+        return RiskAgent.predict_batch(data).to_records()
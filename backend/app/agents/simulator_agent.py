@@ -1,11 +1,38 @@
 import pandas as pd
+import numpy as np
 import logging
-from .risk_agent import RiskAgent
+from itertools import product
+from .risk_agent import RiskAgent, RISK_LABELS, HIGH_RISK, MEDIUM_RISK
 from .impact_agent import ImpactAgent
 
 logger = logging.getLogger(__name__)
 
 class SimulatorAgent:
+    # Heuristic Multipliers (Impact on Attrition Probability)
+    # Lower multiplier = stronger retention effect
+    ACTION_MULTIPLIERS = {
+        "Promotion": 0.70,   # Very strong retention factor
+        "RemoteWork": 0.60,  # Strong work-life balance improvement
+        "Training": 0.75,    # Career growth investment
+    }
+
+    @staticmethod
+    def salary_multiplier(salary_increase_pct):
+        """
+        Salary Impact: each 10% increase reduces risk by 5%, capped at 50% reduction.
+        Works on scalars and arrays; raises <= 0 leave risk unchanged.
+        """
+        pct = np.asarray(salary_increase_pct, dtype=float)
+        return np.where(pct > 0, np.maximum(0.5, 1 - (pct * 0.005)), 1.0)
+
+    @staticmethod
+    def action_multiplier(actions: dict) -> float:
+        mult = 1.0
+        for action, factor in SimulatorAgent.ACTION_MULTIPLIERS.items():
+            if actions.get(action):
+                mult *= factor
+        return mult
+
     @staticmethod
     def simulate_change(employee: dict, changes: dict) -> dict:
         """
@@ -27,57 +54,49 @@ class SimulatorAgent:
             
             # Convert to DF and predict base risk
             df = pd.DataFrame([simulated_data])
-            base_risk_result = RiskAgent.predict_risk(df)[0]
+            base_prob = float(RiskAgent.predict_batch(df).probabilities[0])
             
             # Log for debugging
             logger.info(f"Employee ID: {employee.get('EmployeeID', 'Unknown')}")
             logger.info(f"Original Risk: {employee.get('Risk', {}).get('Label', 'Unknown')}")
-            logger.info(f"Base prediction probability: {base_risk_result['probability']}")
+            logger.info(f"Base prediction probability: {base_prob}")
             
             # 2. Apply Retention Heuristics (Non-Financial Factors)
             # Start with the base prediction (which includes salary changes)
-            current_prob = base_risk_result['probability']
+            current_prob = base_prob
             
             # Calculate salary increase percentage for heuristic
             original_income = raw_data.get('MonthlyIncome', 5000)
             new_income = changes.get('MonthlyIncome', original_income)
             salary_increase_pct = ((new_income - original_income) / original_income) * 100 if original_income > 0 else 0
             
-            # Heuristic Multipliers (Impact on Attrition Probability)
-            # Lower multiplier = stronger retention effect
             factors = []
             
-            # Salary Impact: Each 10% increase reduces risk by ~15%
             if salary_increase_pct > 0:
-                salary_multiplier = max(0.5, 1 - (salary_increase_pct * 0.005))  # Cap at 50% reduction
-                current_prob *= salary_multiplier
+                current_prob *= float(SimulatorAgent.salary_multiplier(salary_increase_pct))
                 factors.append(f"Salary +{salary_increase_pct:.0f}%")
                 logger.info(f"After salary adjustment: {current_prob}")
             
             if changes.get('Promotion'):
-                current_prob *= 0.70  # 40% reduction - Very strong retention factor
+                current_prob *= SimulatorAgent.ACTION_MULTIPLIERS["Promotion"]
                 factors.append("Promotion")
                 logger.info(f"After promotion: {current_prob}")
                 
             if changes.get('RemoteWork'):
-                current_prob *= 0.60 # 25% reduction - Strong work-life balance improvement
+                current_prob *= SimulatorAgent.ACTION_MULTIPLIERS["RemoteWork"]
                 factors.append("Remote Work")
                 logger.info(f"After remote work: {current_prob}")
                 
             if changes.get('Training'):
-                current_prob *= 0.75  # 20% reduction - Career growth investment
+                current_prob *= SimulatorAgent.ACTION_MULTIPLIERS["Training"]
                 factors.append("Training")
                 logger.info(f"After training: {current_prob}")
             
             # Ensure probability stays valid
             new_prob = max(0.01, min(0.99, current_prob))
             
-            # Recalculate Label with adjusted thresholds
-            new_label = "Low Risk"
-            if new_prob > 0.6:
-                new_label = "High Risk"
-            elif new_prob > 0.35:
-                new_label = "Medium Risk"
+            # Recalculate Label with the shared thresholds
+            new_label = RiskAgent.label_for(new_prob)
             
             logger.info(f"Final probability: {new_prob}, Label: {new_label}")
                 
@@ -93,3 +112,73 @@ class SimulatorAgent:
         except Exception as e:
             logger.error(f"Simulation failed: {e}")
             return {"error": str(e)}
+
+    @staticmethod
+    def all_action_combinations() -> list:
+        names = list(SimulatorAgent.ACTION_MULTIPLIERS)
+        return [dict(zip(names, flags)) for flags in product([False, True], repeat=len(names))]
+
+    @staticmethod
+    def sweep_salary(employee: dict, incomes, action_sets: list = None) -> dict:
+        """
+        Risk curve over a range of MonthlyIncome values, for each action set
+        (e.g. {'Promotion': True}). All incomes are scored in one model call;
+        action multipliers are applied on top by broadcasting.
+        Returns the curve and the first income that leaves High / Medium Risk.
+        """
+        try:
+            raw_data = employee.get('RawData', {})
+            if not raw_data:
+                return {"error": "Raw data not available for simulation."}
+
+            incomes = np.sort(np.asarray(incomes, dtype=float))
+            action_sets = action_sets or [{}]
+
+            # 1. One batched prediction: the employee's row repeated per income
+            df = pd.DataFrame([raw_data] * len(incomes))
+            df['MonthlyIncome'] = incomes
+            base_probs = RiskAgent.predict_batch(df).probabilities
+
+            # 2. Heuristics, shape (n_action_sets, n_incomes)
+            original_income = raw_data.get('MonthlyIncome', 5000)
+            if original_income > 0:
+                salary_pct = (incomes - original_income) / original_income * 100
+            else:
+                salary_pct = np.zeros_like(incomes)
+            action_mults = np.array([SimulatorAgent.action_multiplier(a) for a in action_sets])
+            probs = base_probs * SimulatorAgent.salary_multiplier(salary_pct)
+            probs = np.clip(probs[np.newaxis, :] * action_mults[:, np.newaxis], 0.01, 0.99)
+            codes = RiskAgent.label_codes(probs)
+
+            scenarios = []
+            for k, actions in enumerate(action_sets):
+                scenarios.append({
+                    "actions": actions,
+                    "probabilities": probs[k].round(4).tolist(),
+                    "labels": RISK_LABELS[codes[k]].tolist(),
+                    "break_even": {
+                        "below_high": SimulatorAgent._first_income_below(codes[k], HIGH_RISK, incomes, original_income),
+                        "below_medium": SimulatorAgent._first_income_below(codes[k], MEDIUM_RISK, incomes, original_income),
+                    }
+                })
+
+            return {
+                "employee_id": employee.get('EmployeeID'),
+                "original_risk": employee.get('Risk', {}).get('Label'),
+                "original_income": original_income,
+                "incomes": incomes.tolist(),
+                "scenarios": scenarios
+            }
+
+        except Exception as e:
+            logger.error(f"Salary sweep failed: {e}")
+            return {"error": str(e)}
+
+    @staticmethod
+    def _first_income_below(codes, band, incomes, original_income):
+        below = codes < band
+        if not below.any():
+            return None
+        income = float(incomes[np.argmax(below)])
+        raise_pct = (income - original_income) / original_income * 100 if original_income > 0 else None
+        return {"MonthlyIncome": income, "raise_pct": round(raise_pct, 1) if raise_pct is not None else None}
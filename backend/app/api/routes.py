@@ -1,24 +1,65 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-from typing import List, Dict
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Header, Depends, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Dict, Optional
+from pydantic import BaseModel, Field
 import pandas as pd
-import io
+import numpy as np
 import shutil
 import shutil
+import logging
+import os
+import secrets
 from ..agents.coordinator_agent import CoordinatorAgent
 from ..agents.chat_agent import ChatAgent
 from ..agents.simulator_agent import SimulatorAgent
+from ..agents.risk_agent import RiskAgent
+from ..agents.optimizer_agent import OptimizerAgent
+from ..services import ingestion
+from ..services.session_store import (
+    SESSIONS, SessionCapacityError, issue_session_token, verify_session_token
+)
+from ..services.snapshot_store import SNAPSHOTS
+from ..services import profiling
+from ..services.profiling import PROFILING
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# In-memory storage for the session
+# In-memory, per-session storage (see services/session_store.py)
 # In production, this would be a database (PostgreSQL/Redis)
-SESSION_DB = {
-    "employees": [],
-    "summary": {}
-}
+
+def get_session_id(x_session_id: Optional[str] = Header(default=None, max_length=128)) -> str:
+    # Each browser sends the X-Session-ID it got from POST /session
+    if not x_session_id or not verify_session_token(x_session_id):
+        raise HTTPException(status_code=401, detail="Missing or invalid session. Call POST /api/v1/session first.")
+    return x_session_id
+
+@router.post("/session")
+def create_session():
+    # Server-issued, signed ID; clients cannot choose or guess another session's ID
+    return {"session_id": issue_session_token()}
+
+# Upload history is grouped by dataset name, shared across sessions (see services/snapshot_store.py)
+DATASET_PATTERN = r"^[A-Za-z0-9_.-]{1,64}$"
+
+def get_profile_id(
+    x_profile: Optional[str] = Header(default=None),
+    x_request_id: Optional[str] = Header(default=None, max_length=256)
+) -> Optional[str]:
+    # Opt-in per request (X-Profile: 1), honoured only while profiling is switched on
+    if not PROFILING.enabled or not profiling.is_truthy(x_profile):
+        return None
+    return profiling.request_id(x_request_id)
 
 @router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(
+    response: Response,
+    file: UploadFile = File(...),
+    dataset: str = Form(default="default", pattern=DATASET_PATTERN),
+    session_id: str = Depends(get_session_id),
+    profile_id: Optional[str] = Depends(get_profile_id)
+):
     # Support CSV and Excel types
     allowed_types = [
         "text/csv", 
@@ -37,90 +78,39 @@ async def upload_file(file: UploadFile = File(...)):
          raise HTTPException(status_code=400, detail=f"Unsupported file format. Please upload CSV or Excel. detected: {file.filename}")
     
     try:
-        content = await file.read()
-        file_obj = io.BytesIO(content)
-        
-        if is_csv:
-            df = pd.read_csv(file_obj)
-        elif is_excel:
-            df = pd.read_excel(file_obj)
-        elif is_pdf:
+        if is_pdf:
             raise HTTPException(
                 status_code=400, 
                 detail="PDF Upload Detected. Please convert your PDF data to Excel (XLSX) or CSV format for analysis."
             )
 
-        # --- LENIENT COLUMN MATCHING ---
-        # Map common variations to standard names
-        column_map = {
-            'employee id': 'EmployeeID', 'id': 'EmployeeID', 'employee_id': 'EmployeeID',
-            'monthly income': 'MonthlyIncome', 'income': 'MonthlyIncome', 'salary': 'MonthlyIncome',
-            'total working years': 'TotalWorkingYears', 'experience': 'TotalWorkingYears', 'working years': 'TotalWorkingYears',
-            'years at company': 'YearsAtCompany', 'tenure': 'YearsAtCompany', 'years in company': 'YearsAtCompany',
-            'performance rating': 'PerformanceRating', 'rating': 'PerformanceRating', 'performance': 'PerformanceRating',
-            'name': 'Name', 'employee name': 'Name'
-        }
-        
-        # Normalize columns: lower case -> check map -> rename
-        df.columns = [column_map.get(c.lower().strip(), c) for c in df.columns]
+        # Refuse before parsing and scoring if this session could not be stored anyway
+        try:
+            SESSIONS.ensure_capacity(session_id)
+        except SessionCapacityError:
+            raise _capacity_exceeded()
 
-        # Handle Missing Critical Columns with Defaults or Generation
-        if 'EmployeeID' not in df.columns:
-            # Generate IDs if missing
-            df['EmployeeID'] = [f"GEN-{i+1000}" for i in range(len(df))]
-        
-        # Ensure numeric types for calculation columns (fill NaN with 0 or mean)
-        calc_cols = ['MonthlyIncome', 'TotalWorkingYears', 'YearsAtCompany', 'PerformanceRating']
-        for col in calc_cols:
-            if col not in df.columns:
-                # If a critical calc column is missing, we can't score Impact accurately, 
-                # but we shouldn't block the upload. We'll add it with default.
-                df[col] = 0
-            else:
-                # Force numeric, coerce errors to NaN, then fill
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-
-        # Process with Coordinator
-        results = CoordinatorAgent.process_data(df)
-        
-        # Store results
-        SESSION_DB["employees"] = results
-        
-        # Compute Summary
+        content = await file.read()
+        # Profiling (if requested) runs in the worker thread doing the scoring
+        (results, summary), profile_path = await run_in_threadpool(
+            profiling.run_profiled, profile_id, _process_upload, content, filename
+        )
+        if profile_path:
+            response.headers["X-Profile-Artifact"] = os.path.basename(profile_path)
+
+        # Atomic swap: readers see either the previous dataset or this one.
+        # Capacity is checked again: another session may have taken the last slot meanwhile
+        try:
+            SESSIONS.publish(session_id, results, summary)
+        except SessionCapacityError:
+            raise _capacity_exceeded()
         total = len(results)
-        risks = [r['Risk']['Label'] for r in results]
-        high = risks.count("High Risk")
-        medium = risks.count("Medium Risk")
-        low = risks.count("Low Risk")
-        critical = len([r for r in results if r['Impact']['category'] == "Critical"])
-        
-        # --- NEW AGGREGATIONS ---
-        # 1. Risk by Department
-        dept_risk = {}
-        for r in results:
-            dept = r['Department']
-            if r['Risk']['Label'] == 'High Risk':
-                dept_risk[dept] = dept_risk.get(dept, 0) + 1
-        
-        # 2. Top Risk Factors (Systemic Issues)
-        factor_counts = {}
-        for r in results:
-            if r['Risk']['Label'] in ['High Risk', 'Medium Risk']:
-                for factor in r['KeyFactors']:
-                    # clean up factor string if needed
-                    factor_counts[factor] = factor_counts.get(factor, 0) + 1
-        
-        # Sort and take top 5
-        top_factors = sorted(factor_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        
-        SESSION_DB["summary"] = {
-            "total_employees": total,
-            "risk_breakdown": {"High": high, "Medium": medium, "Low": low},
-            "critical_talent": critical,
-            "department_risk": dept_risk,
-            "top_risk_factors": top_factors, # List of (factor, count)
-            "insights": _generate_insights(results)
-        }
+
+        # Append to history; a failure here must not fail the upload itself
+        try:
+            await run_in_threadpool(SNAPSHOTS.record, dataset, file.filename, results, summary)
+        except Exception as e:
+            logger.error(f"Failed to record snapshot history: {e}", exc_info=True)
         
         return {"message": "File processed successfully", "count": total}
         
@@ -133,9 +123,86 @@ async def upload_file(file: UploadFile = File(...)):
         # Catch-all for other errors
         raise HTTPException(status_code=500, detail=f"System Error: {str(e)}")
 
+def _capacity_exceeded() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server is holding the maximum number of active datasets. Please retry later.",
+        headers={"Retry-After": "60"}
+    )
+
+def _process_upload(content: bytes, filename: str):
+    """
+    Parses, scores and summarises an upload. CPU-bound, so it runs in the
+    threadpool; nothing is published until it has fully finished.
+    """
+    # Parse via the ingestion layer (fast engine, needed columns only,
+    # cached by content hash so re-uploads skip parsing)
+    df = ingestion.load_upload(content, filename, feature_names=RiskAgent.feature_names())
+
+    # --- LENIENT COLUMN MATCHING ---
+    # Normalize columns: lower case -> check map -> rename
+    df.columns = [ingestion.normalize_column(c) for c in df.columns]
+
+    # Handle Missing Critical Columns with Defaults or Generation
+    if 'EmployeeID' not in df.columns:
+        # Generate IDs if missing
+        df['EmployeeID'] = [f"GEN-{i+1000}" for i in range(len(df))]
+    
+    # Ensure numeric types for calculation columns (fill NaN with 0 or mean)
+    calc_cols = ['MonthlyIncome', 'TotalWorkingYears', 'YearsAtCompany', 'PerformanceRating']
+    for col in calc_cols:
+        if col not in df.columns:
+            # If a critical calc column is missing, we can't score Impact accurately, 
+            # but we shouldn't block the upload. We'll add it with default.
+            df[col] = 0
+        else:
+            # Force numeric, coerce errors to NaN, then fill
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+    # Process with Coordinator
+    results = CoordinatorAgent.process_data(df)
+    
+    # Compute Summary
+    total = len(results)
+    risks = [r['Risk']['Label'] for r in results]
+    high = risks.count("High Risk")
+    medium = risks.count("Medium Risk")
+    low = risks.count("Low Risk")
+    critical = len([r for r in results if r['Impact']['category'] == "Critical"])
+    
+    # --- NEW AGGREGATIONS ---
+    # 1. Risk by Department
+    dept_risk = {}
+    for r in results:
+        dept = r['Department']
+        if r['Risk']['Label'] == 'High Risk':
+            dept_risk[dept] = dept_risk.get(dept, 0) + 1
+    
+    # 2. Top Risk Factors (Systemic Issues)
+    factor_counts = {}
+    for r in results:
+        if r['Risk']['Label'] in ['High Risk', 'Medium Risk']:
+            for factor in r['KeyFactors']:
+                # clean up factor string if needed
+                factor_counts[factor] = factor_counts.get(factor, 0) + 1
+    
+    # Sort and take top 5
+    top_factors = sorted(factor_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+    
+    summary = {
+        "total_employees": total,
+        "risk_breakdown": {"High": high, "Medium": medium, "Low": low},
+        "critical_talent": critical,
+        "department_risk": dept_risk,
+        "top_risk_factors": top_factors, # List of (factor, count)
+        "insights": _generate_insights(results)
+    }
+    return results, summary
+
 @router.get("/dashboard/summary")
-def get_summary():
-    if not SESSION_DB["summary"]:
+def get_summary(session_id: str = Depends(get_session_id)):
+    snapshot = SESSIONS.get(session_id)
+    if not snapshot.summary:
         # Return empty state if no data
         return {
             "total_employees": 0,
@@ -143,21 +210,63 @@ def get_summary():
             "critical_talent": 0,
             "insights": ["Please upload a dataset to generate insights."]
         }
-    return SESSION_DB["summary"]
+    return dict(snapshot.summary)
 
 @router.get("/employees")
-def get_employees():
+def get_employees(session_id: str = Depends(get_session_id)):
     # Returns lightweight list for table view
     # Filter sensitive/large data if needed, but for now return all
-    return SESSION_DB["employees"]
+    return SESSIONS.get(session_id).employees
 
 @router.get("/employees/{employee_id}")
-def get_employee_detail(employee_id: str):
-    emp = next((e for e in SESSION_DB["employees"] if e["EmployeeID"] == employee_id), None)
+def get_employee_detail(employee_id: str, session_id: str = Depends(get_session_id)):
+    emp = SESSIONS.get(session_id).by_id.get(employee_id)
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
     return emp
 
+@router.get("/history/snapshots", dependencies=[Depends(get_session_id)])
+def list_snapshots(
+    limit: int = Query(default=100, ge=1, le=1000),
+    dataset: str = Query(default="default", pattern=DATASET_PATTERN)
+):
+    # Newest first
+    return SNAPSHOTS.list_snapshots(dataset, limit)
+
+@router.get("/history/employees/{employee_id}", dependencies=[Depends(get_session_id)])
+def get_employee_history(employee_id: str, dataset: str = Query(default="default", pattern=DATASET_PATTERN)):
+    history = SNAPSHOTS.employee_history(dataset, employee_id)
+    if not history:
+        raise HTTPException(status_code=404, detail="No history for this employee")
+    return {"employee_id": employee_id, "dataset": dataset, "history": history}
+
+@router.get("/history/departments", dependencies=[Depends(get_session_id)])
+def get_department_trends(
+    department: Optional[str] = None,
+    dataset: str = Query(default="default", pattern=DATASET_PATTERN)
+):
+    return SNAPSHOTS.department_trends(dataset, department)
+
+# --- ADMIN ---
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled. Set ADMIN_TOKEN to enable them.")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+class ProfilingToggle(BaseModel):
+    enabled: bool
+
+@router.get("/admin/profiling", dependencies=[Depends(require_admin)])
+def get_profiling_status():
+    return {"enabled": PROFILING.enabled, "profiles_dir": profiling.PROFILES_DIR}
+
+@router.post("/admin/profiling", dependencies=[Depends(require_admin)])
+def set_profiling(toggle: ProfilingToggle):
+    PROFILING.set(toggle.enabled)
+    return {"enabled": PROFILING.enabled}
+
 def _generate_insights(results):
     insights = []
     
@@ -191,16 +300,15 @@ def _generate_insights(results):
     return insights[:3]
 
 # --- NEW ENDPOINTS ---
-from pydantic import BaseModel
 
 class ChatRequest(BaseModel):
     message: str
     history: List[Dict] = []
 
 @router.post("/chat")
-def chat_with_agent(req: ChatRequest):
+def chat_with_agent(req: ChatRequest, session_id: str = Depends(get_session_id)):
     # Pass summary context
-    context = SESSION_DB.get("summary", {})
+    context = dict(SESSIONS.get(session_id).summary)
     response = ChatAgent.chat(req.history + [{"role": "user", "content": req.message}], context)
     return {"response": response}
 
@@ -209,11 +317,66 @@ class SimulationRequest(BaseModel):
     changes: Dict
 
 @router.post("/simulate")
-def simulate_risk(req: SimulationRequest):
+def simulate_risk(req: SimulationRequest, session_id: str = Depends(get_session_id)):
     # Find employee
-    emp = next((e for e in SESSION_DB["employees"] if e["EmployeeID"] == req.employee_id), None)
+    emp = SESSIONS.get(session_id).by_id.get(req.employee_id)
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
         
     result = SimulatorAgent.simulate_change(emp, req.changes)
     return result
+
+class SweepRequest(BaseModel):
+    employee_id: str
+    min_income: float = Field(gt=0)
+    max_income: float = Field(gt=0)
+    steps: int = Field(default=21, ge=2, le=500)
+    # Action sets to evaluate, e.g. [{}, {"Promotion": true}]
+    actions: List[Dict[str, bool]] = [{}]
+    # Evaluate every Promotion/RemoteWork/Training combination instead of `actions`
+    all_combinations: bool = False
+
+@router.post("/simulate/sweep")
+def sweep_salary(req: SweepRequest, session_id: str = Depends(get_session_id)):
+    if req.min_income > req.max_income:
+        raise HTTPException(status_code=400, detail="min_income must not exceed max_income")
+    unknown = {name for actions in req.actions for name in actions} - set(SimulatorAgent.ACTION_MULTIPLIERS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown actions in actions: {', '.join(sorted(unknown))}")
+
+    emp = SESSIONS.get(session_id).by_id.get(req.employee_id)
+    if not emp:
+        raise HTTPException(status_code=404, detail="Employee not found")
+
+    incomes = np.linspace(req.min_income, req.max_income, req.steps)
+    action_sets = SimulatorAgent.all_action_combinations() if req.all_combinations else req.actions
+    return SimulatorAgent.sweep_salary(emp, incomes, action_sets)
+
+class BudgetRequest(BaseModel):
+    budget: float = Field(ge=0)  # Annual retention budget
+    raise_levels: List[float] = Field(default_factory=lambda: list(OptimizerAgent.DEFAULT_RAISE_LEVELS))
+    # Annual cost per employee of Promotion / RemoteWork / Training (defaults in OptimizerAgent)
+    action_costs: Dict[str, float] = {}
+    min_priority: float = 0.0
+    department: Optional[str] = None
+    limit: Optional[int] = Field(default=None, ge=1)
+
+@router.post("/optimize/budget")
+def optimize_budget(req: BudgetRequest, session_id: str = Depends(get_session_id)):
+    unknown = set(req.action_costs) - set(SimulatorAgent.ACTION_MULTIPLIERS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown actions in action_costs: {', '.join(sorted(unknown))}")
+    if any(not 0 <= pct <= 100 for pct in req.raise_levels):
+        raise HTTPException(status_code=400, detail="raise_levels must be percentages between 0 and 100")
+
+    employees = SESSIONS.get(session_id).employees
+    if not employees:
+        raise HTTPException(status_code=404, detail="No dataset uploaded")
+
+    result = OptimizerAgent.optimize_budget(
+        employees, req.budget, req.raise_levels, req.action_costs, req.min_priority, req.department
+    )
+    if req.limit is not None:
+        result["recommendations"] = result["recommendations"][:req.limit]
+    return result
+
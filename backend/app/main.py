@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .api import routes
+from .services.admission import AdmissionMiddleware, UPLOAD_GATE, SIMULATION_GATE
 
 app = FastAPI(
     title="HR Decision Support System",
@@ -8,6 +9,20 @@ app = FastAPI(
     version="1.0.0"
 )
 
+API_PREFIX = "/api/v1"
+
+# Admission control runs before the body is read; added before CORS so that
+# CORS stays outermost and 429 responses still carry CORS headers
+app.add_middleware(
+    AdmissionMiddleware,
+    gates={
+        ("POST", f"{API_PREFIX}/upload"): UPLOAD_GATE,
+        ("POST", f"{API_PREFIX}/simulate"): SIMULATION_GATE,
+        ("POST", f"{API_PREFIX}/simulate/sweep"): SIMULATION_GATE,
+        ("POST", f"{API_PREFIX}/optimize/budget"): SIMULATION_GATE,
+    },
+)
+
 # CORS Configuration
 # Allow all for development simplicity
 app.add_middleware(
@@ -19,7 +34,7 @@ app.add_middleware(
 )
 
 # Include Router
-app.include_router(routes.router, prefix="/api/v1")
+app.include_router(routes.router, prefix=API_PREFIX)
 
 @app.get("/")
 def health_check():
@@ -0,0 +1,60 @@
+import logging
+import os
+import threading
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionGate:
+    """
+    Caps how many requests of one kind a worker runs at once.
+    `try_enter` never blocks: callers reject the request when it returns False.
+    """
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self._slots = threading.BoundedSemaphore(limit)
+
+    def try_enter(self) -> bool:
+        admitted = self._slots.acquire(blocking=False)
+        if not admitted:
+            logger.warning(f"Rejected {self.name} request: {self.limit} already in flight")
+        return admitted
+
+    def leave(self):
+        self._slots.release()
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware applying AdmissionGates by (method, path) before the
+    request body is read, so rejected uploads are never received or spooled.
+    """
+
+    def __init__(self, app, gates: dict):
+        self.app = app
+        self.gates = gates
+
+    async def __call__(self, scope, receive, send):
+        gate = self.gates.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+        if not gate.try_enter():
+            response = JSONResponse(
+                {"detail": f"Too many concurrent {gate.name} requests. Please retry shortly."},
+                status_code=429,
+                headers={"Retry-After": "5"}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.leave()
+
+
+UPLOAD_GATE = AdmissionGate("upload", int(os.getenv("MAX_CONCURRENT_UPLOADS", 2)))
+SIMULATION_GATE = AdmissionGate("simulation", int(os.getenv("MAX_CONCURRENT_SIMULATIONS", 16)))
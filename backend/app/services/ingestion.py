@@ -0,0 +1,169 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# --- OPTIONAL FAST PATHS ---
+# python-calamine (Rust) parses .xlsx/.xls several times faster than openpyxl.
+# pandas >= 2.2 exposes it as engine="calamine".
+try:
+    import python_calamine  # noqa: F401
+    _HAS_CALAMINE = True
+except ImportError:
+    _HAS_CALAMINE = False
+
+# Parquet needs pyarrow; without it the cache falls back to pandas' pickle format.
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+# -----------------------------------
+
+CACHE_DIR = os.getenv(
+    "UPLOAD_CACHE_DIR",
+    os.path.normpath(os.path.join(os.path.dirname(__file__), '../../cache/uploads'))
+)
+CACHE_MAX_FILES = int(os.getenv("UPLOAD_CACHE_MAX_FILES", 64))
+# Cache entries outlive deploys: bump when parsing changes in a way the
+# hashed options below do not capture
+CACHE_FORMAT_VERSION = 1
+
+# Map common variations to standard names
+COLUMN_MAP = {
+    'employee id': 'EmployeeID', 'id': 'EmployeeID', 'employee_id': 'EmployeeID',
+    'monthly income': 'MonthlyIncome', 'income': 'MonthlyIncome', 'salary': 'MonthlyIncome',
+    'total working years': 'TotalWorkingYears', 'experience': 'TotalWorkingYears', 'working years': 'TotalWorkingYears',
+    'years at company': 'YearsAtCompany', 'tenure': 'YearsAtCompany', 'years in company': 'YearsAtCompany',
+    'performance rating': 'PerformanceRating', 'rating': 'PerformanceRating', 'performance': 'PerformanceRating',
+    'name': 'Name', 'employee name': 'Name'
+}
+
+# Columns the app itself reads (Impact, heuristics, display), beyond model features
+BASE_COLUMNS = {
+    'EmployeeID', 'Name', 'Department',
+    'MonthlyIncome', 'TotalWorkingYears', 'YearsAtCompany', 'PerformanceRating',
+    'OverTime', 'DistanceFromHome', 'WorkLifeBalance',
+}
+
+
+def normalize_column(name) -> str:
+    return COLUMN_MAP.get(str(name).lower().strip(), name)
+
+
+def excel_engine():
+    """
+    Returns the fastest available Excel reader engine (None = pandas default).
+    """
+    return "calamine" if _HAS_CALAMINE else None
+
+
+def needed_columns(feature_names=None):
+    """
+    Builds a `usecols` callable keeping only model features plus BASE_COLUMNS.
+    Returns None (read everything) when the model does not expose its features.
+    """
+    if feature_names is None:
+        return None
+    wanted = BASE_COLUMNS | {str(f) for f in feature_names}
+    return lambda col: normalize_column(col) in wanted
+
+
+def load_upload(content: bytes, filename: str, feature_names=None, sheet_name=0) -> pd.DataFrame:
+    """
+    Parses an uploaded CSV/Excel file into a DataFrame.
+
+    The parsed frame is cached on disk under a hash of the file content and
+    read options, so re-uploading the same file skips parsing entirely.
+    """
+    is_excel = filename.lower().endswith(('.xls', '.xlsx'))
+    cols = sorted(str(f) for f in feature_names) if feature_names is not None else None
+    key = _cache_key(content, {
+        "version": CACHE_FORMAT_VERSION,
+        "excel": is_excel,
+        "sheet": sheet_name,
+        "cols": cols,
+        # Column selection depends on these too, so editing them invalidates old entries
+        "base": sorted(BASE_COLUMNS),
+        "map": COLUMN_MAP,
+    })
+
+    cached = _read_cache(key)
+    if cached is not None:
+        logger.info(f"Upload cache hit for {filename} ({key[:12]})")
+        return cached
+
+    usecols = needed_columns(feature_names)
+    file_obj = io.BytesIO(content)
+    if is_excel:
+        df = pd.read_excel(file_obj, sheet_name=sheet_name, usecols=usecols, engine=excel_engine())
+    else:
+        df = pd.read_csv(file_obj, usecols=usecols)
+
+    _write_cache(key, df)
+    return df
+
+
+def _cache_key(content: bytes, options: dict) -> str:
+    digest = hashlib.sha256(content)
+    digest.update(json.dumps(options, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    ext = ".parquet" if _HAS_PYARROW else ".pkl"
+    return os.path.join(CACHE_DIR, key + ext)
+
+
+def _read_cache(key: str):
+    path = _cache_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path) if _HAS_PYARROW else pd.read_pickle(path)
+        os.utime(path)  # Keep recently used entries from being evicted
+        return df
+    except Exception as e:
+        logger.warning(f"Discarding unreadable upload cache entry {path}: {e}")
+        return None
+
+
+def _write_cache(key: str, df: pd.DataFrame):
+    path = _cache_path(key)
+    tmp_path = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Unique per write: concurrent uploads of the same file must not share a temp file
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, prefix=f"{key[:12]}.", suffix=".tmp")
+        os.close(fd)
+        if _HAS_PYARROW:
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)  # Atomic, so concurrent readers never see a partial file
+        _evict()
+    except Exception as e:
+        # Caching is best-effort (e.g. mixed-type object columns Parquet rejects)
+        logger.warning(f"Could not cache parsed upload: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _evict():
+    entries = [
+        os.path.join(CACHE_DIR, f) for f in os.listdir(CACHE_DIR)
+        if f.endswith((".parquet", ".pkl"))
+    ]
+    if len(entries) <= CACHE_MAX_FILES:
+        return
+    entries.sort(key=os.path.getmtime)
+    for path in entries[:len(entries) - CACHE_MAX_FILES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
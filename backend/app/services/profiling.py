@@ -0,0 +1,172 @@
+import cProfile
+import logging
+import marshal
+import os
+import re
+import threading
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# pyinstrument is a low-overhead sampling profiler and writes speedscope flame
+# graphs. Without it we fall back to cProfile (deterministic, heavier, .prof output).
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import SpeedscopeRenderer
+    _HAS_PYINSTRUMENT = True
+except ImportError:
+    _HAS_PYINSTRUMENT = False
+
+PROFILES_DIR = os.getenv(
+    "PROFILES_DIR",
+    os.path.normpath(os.path.join(os.path.dirname(__file__), '../../profiles'))
+)
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", 0.001))
+PROFILES_MAX_FILES = int(os.getenv("PROFILES_MAX_FILES", 100))
+
+_SAFE_ID = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class ProfilingSwitch:
+    """
+    Process-wide on/off switch. When off, profiled code paths pay for a
+    single boolean check and nothing else.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self._enabled = enabled
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def set(self, enabled: bool):
+        with self._lock:
+            self._enabled = enabled
+        logger.warning(f"Request profiling {'ENABLED' if enabled else 'disabled'}")
+
+
+def is_truthy(value) -> bool:
+    """Parses flag values such as '1', 'true', 'yes', 'on'. '0', 'false' and empty are off."""
+    return str(value or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+PROFILING = ProfilingSwitch(is_truthy(os.getenv("PROFILING_ENABLED")))
+
+
+def request_id(raw: str = None) -> str:
+    """Sanitised caller-supplied request ID (used in file names), or a fresh one."""
+    if raw:
+        cleaned = _SAFE_ID.sub("_", raw)[:64]
+        if cleaned.strip("_"):
+            return cleaned
+    return uuid.uuid4().hex
+
+
+def _artifact_ext() -> str:
+    return ".speedscope.json" if _HAS_PYINSTRUMENT else ".prof"
+
+
+def artifact_path(req_id: str, suffix: int = 0) -> str:
+    name = req_id if not suffix else f"{req_id}-{suffix}"
+    return os.path.join(PROFILES_DIR, name + _artifact_ext())
+
+
+def _open_new_artifact(req_id: str, mode: str):
+    """
+    Opens a fresh artifact file, never overwriting an earlier profile: a
+    repeated request ID gets a numeric suffix (req-1, req-2, ...).
+    """
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    suffix = 0
+    while True:
+        path = artifact_path(req_id, suffix)
+        try:
+            return open(path, mode), path
+        except FileExistsError:
+            suffix += 1
+
+
+def _evict():
+    # Keep PROFILES_DIR bounded: drop the oldest artifacts beyond PROFILES_MAX_FILES
+    entries = [
+        os.path.join(PROFILES_DIR, f) for f in os.listdir(PROFILES_DIR)
+        if f.endswith((".speedscope.json", ".prof"))
+    ]
+    if len(entries) <= PROFILES_MAX_FILES:
+        return
+    entries.sort(key=os.path.getmtime)
+    for path in entries[:len(entries) - PROFILES_MAX_FILES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+# Only one request is profiled at a time: cProfile (Python 3.12+) refuses a
+# second active profiler, and overlapping samples would blur both profiles.
+_ACTIVE = threading.Lock()
+
+
+def _start_profiler():
+    try:
+        if _HAS_PYINSTRUMENT:
+            profiler = Profiler(interval=SAMPLE_INTERVAL, async_mode="disabled")
+            profiler.start()
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        return profiler
+    except Exception as e:
+        logger.warning(f"Could not start profiler: {e}")
+        return None
+
+
+def _stop_and_write(profiler, req_id: str):
+    """Stops the profiler and writes the artifact. Returns its path, or None on failure."""
+    try:
+        if _HAS_PYINSTRUMENT:
+            profiler.stop()
+            output = profiler.output(SpeedscopeRenderer())
+            f, path = _open_new_artifact(req_id, "x")
+            with f:
+                f.write(output)
+        else:
+            profiler.disable()
+            profiler.create_stats()
+            f, path = _open_new_artifact(req_id, "xb")
+            with f:
+                marshal.dump(profiler.stats, f)  # Same format as Profile.dump_stats
+        logger.info(f"Wrote profile {path}")
+        _evict()
+        return path
+    except Exception as e:
+        logger.warning(f"Could not write profile for request {req_id}: {e}")
+        return None
+
+
+def run_profiled(req_id, fn, *args, **kwargs):
+    """
+    Calls fn(*args, **kwargs) in the calling thread, profiled when `req_id` is set.
+    Returns (result, artifact path or None). Profiling is best-effort: if the
+    profiler cannot start or write, or another request is being profiled,
+    fn still runs and its result is returned unchanged.
+    """
+    if req_id is None:
+        return fn(*args, **kwargs), None
+    if not _ACTIVE.acquire(blocking=False):
+        logger.warning(f"Skipping profile for request {req_id}: another profile is in progress")
+        return fn(*args, **kwargs), None
+    try:
+        profiler = _start_profiler()
+        if profiler is None:
+            return fn(*args, **kwargs), None
+        path = None
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            path = _stop_and_write(profiler, req_id)
+        return result, path
+    finally:
+        _ACTIVE.release()
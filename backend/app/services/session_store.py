@@ -0,0 +1,132 @@
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+logger = logging.getLogger(__name__)
+
+# --- SESSION TOKENS ---
+# Session IDs are issued by the server (POST /session) and signed, so clients
+# cannot pick or guess another session's ID. This separates browsers/users;
+# it is a bearer token, not authentication: whoever holds a token sees its data.
+# Set SESSION_SECRET so tokens survive restarts and work across workers.
+_SESSION_SECRET = os.getenv("SESSION_SECRET", "").encode() or secrets.token_bytes(32)
+
+
+def _sign(nonce: str) -> str:
+    return hmac.new(_SESSION_SECRET, nonce.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def issue_session_token() -> str:
+    nonce = secrets.token_urlsafe(24)
+    return f"{nonce}.{_sign(nonce)}"
+
+
+def verify_session_token(token: str) -> bool:
+    nonce, _, signature = (token or "").partition(".")
+    # Compare bytes: headers are decoded as latin-1, and compare_digest rejects non-ASCII str
+    return bool(nonce) and hmac.compare_digest(signature.encode(), _sign(nonce).encode())
+
+
+class SessionCapacityError(Exception):
+    """Raised when every session slot is held by a session that is still active."""
+
+
+@dataclass(frozen=True)
+class SessionSnapshot:
+    """
+    Immutable view of one session's scored dataset.
+    Uploads build a new snapshot and swap it in; readers keep whichever
+    snapshot they grabbed, so they never observe a half-finished upload.
+    """
+    employees: Tuple[dict, ...] = ()
+    summary: Mapping = field(default_factory=lambda: MappingProxyType({}))
+    by_id: Mapping = field(default_factory=lambda: MappingProxyType({}))
+
+    @classmethod
+    def build(cls, employees, summary: dict) -> "SessionSnapshot":
+        employees = tuple(employees)
+        return cls(
+            employees=employees,
+            summary=MappingProxyType(dict(summary)),
+            by_id=MappingProxyType({e["EmployeeID"]: e for e in employees}),
+        )
+
+
+EMPTY_SNAPSHOT = SessionSnapshot()
+
+
+class SessionStore:
+    """
+    Per-session snapshots with copy-on-write swaps.
+    Bounded to `max_sessions`. Only sessions idle for longer than `idle_ttl`
+    seconds are evicted to make room; an active session is never pushed out
+    by a new one (the new upload is refused with SessionCapacityError instead).
+    """
+
+    def __init__(self, max_sessions: int = 32, idle_ttl: float = 3600):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        # session_id -> (snapshot, last_used monotonic time), least recently used first
+        self._sessions: "OrderedDict[str, Tuple[SessionSnapshot, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> SessionSnapshot:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return EMPTY_SNAPSHOT
+            self._sessions[session_id] = (entry[0], time.monotonic())
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+
+    def ensure_capacity(self, session_id: str):
+        """
+        Raises SessionCapacityError if `session_id` could not be published right
+        now. Called before expensive work; `publish` re-checks for the race.
+        """
+        with self._lock:
+            self._make_room(session_id, time.monotonic())
+
+    def publish(self, session_id: str, employees, summary: dict) -> SessionSnapshot:
+        # Build outside the lock; only the reference swap is serialised
+        snapshot = SessionSnapshot.build(employees, summary)
+        with self._lock:
+            now = time.monotonic()
+            self._make_room(session_id, now)
+            self._sessions[session_id] = (snapshot, now)
+            self._sessions.move_to_end(session_id)
+        return snapshot
+
+    def _make_room(self, session_id: str, now: float):
+        # Caller holds the lock
+        if session_id not in self._sessions and len(self._sessions) >= self.max_sessions:
+            self._evict_idle(now)
+            if len(self._sessions) >= self.max_sessions:
+                raise SessionCapacityError(f"All {self.max_sessions} session slots are in use")
+
+    def _evict_idle(self, now: float):
+        # Oldest first, so stop at the first session that is still active
+        while self._sessions:
+            session_id, (_, last_used) = next(iter(self._sessions.items()))
+            if now - last_used < self.idle_ttl:
+                break
+            self._sessions.popitem(last=False)
+            logger.info(f"Evicted idle session '{session_id[:8]}...'")
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+
+
+SESSIONS = SessionStore(
+    max_sessions=int(os.getenv("MAX_SESSIONS", 32)),
+    idle_ttl=float(os.getenv("SESSION_IDLE_TTL", 3600)),
+)
@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+import pandas as pd
+from ..agents.risk_agent import RISK_LABELS, RiskAgent, HIGH_RISK, MEDIUM_RISK
+
+logger = logging.getLogger(__name__)
+
+DB_PATH = os.getenv(
+    "SNAPSHOT_DB_PATH",
+    os.path.normpath(os.path.join(os.path.dirname(__file__), '../../data/snapshots.db'))
+)
+
+# Append-only: rows are only ever inserted, one snapshot per upload.
+# Snapshots are grouped by a caller-chosen dataset name, not by session: session
+# tokens rotate (restarts, new browsers) while history must outlive them.
+# Both detail tables are clustered (WITHOUT ROWID) on their lookup key, so
+# history/trend queries read a contiguous range regardless of snapshot count.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dataset TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    filename TEXT,
+    employee_count INTEGER NOT NULL,
+    summary_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_dataset ON snapshots (dataset, id);
+
+CREATE TABLE IF NOT EXISTS employee_scores (
+    employee_id TEXT NOT NULL,
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    department TEXT,
+    probability REAL NOT NULL,
+    risk_code INTEGER NOT NULL,
+    impact_score REAL,
+    priority_score REAL,
+    PRIMARY KEY (employee_id, snapshot_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS department_stats (
+    department TEXT NOT NULL,
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id),
+    employees INTEGER NOT NULL,
+    high_risk INTEGER NOT NULL,
+    medium_risk INTEGER NOT NULL,
+    mean_probability REAL NOT NULL,
+    mean_impact REAL NOT NULL,
+    PRIMARY KEY (department, snapshot_id)
+) WITHOUT ROWID;
+"""
+
+
+class SnapshotStore:
+    """
+    Local SQLite history of every upload's scored results and summary,
+    for per-employee risk history and department trend lines. Shared by
+    everyone using this deployment; `dataset` separates unrelated exports.
+    """
+
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")  # Readers don't block the writer
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._schema_ready:
+            with self._schema_lock:
+                conn.executescript(SCHEMA)
+                self._schema_ready = True
+        return conn
+
+    def record(self, dataset: str, filename: str, results: list, summary: dict) -> int:
+        """
+        Appends one upload's scored employees and summary. Returns the snapshot id.
+        """
+        frame = pd.DataFrame({
+            "employee_id": [r["EmployeeID"] for r in results],
+            "department": [str(r.get("Department", "Unknown")) for r in results],
+            "probability": [r["Risk"]["Probability"] for r in results],
+            "impact_score": [r["Impact"]["score"] for r in results],
+            "priority_score": [r["PriorityScore"] for r in results],
+        })
+        # One row per employee per snapshot, so history, counts and department
+        # stats agree. Last occurrence wins, matching the session's by-id lookup.
+        duplicated = frame["employee_id"].duplicated(keep="last")
+        if duplicated.any():
+            logger.warning(
+                f"Upload '{filename}' has {int(duplicated.sum())} duplicate EmployeeID rows; "
+                f"keeping the last occurrence in history"
+            )
+            frame = frame[~duplicated].reset_index(drop=True)
+        frame["risk_code"] = RiskAgent.label_codes(frame["probability"].to_numpy())
+
+        dept = frame.groupby("department").agg(
+            employees=("employee_id", "size"),
+            high_risk=("risk_code", lambda c: int((c == HIGH_RISK).sum())),
+            medium_risk=("risk_code", lambda c: int((c == MEDIUM_RISK).sum())),
+            mean_probability=("probability", "mean"),
+            mean_impact=("impact_score", "mean"),
+        ).reset_index()
+
+        conn = self._conn()
+        with conn:  # Single transaction: a snapshot is either fully recorded or absent
+            cur = conn.execute(
+                "INSERT INTO snapshots (dataset, created_at, filename, employee_count, summary_json) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (dataset, datetime.now(timezone.utc).isoformat(), filename, len(frame),
+                 json.dumps(summary, default=str))
+            )
+            snapshot_id = cur.lastrowid
+            conn.executemany(
+                "INSERT INTO employee_scores (employee_id, snapshot_id, department, probability, "
+                "risk_code, impact_score, priority_score) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (e, snapshot_id, d, float(p), int(c), float(i), float(s))
+                    for e, d, p, c, i, s in zip(
+                        frame["employee_id"], frame["department"], frame["probability"],
+                        frame["risk_code"], frame["impact_score"], frame["priority_score"])
+                )
+            )
+            conn.executemany(
+                "INSERT INTO department_stats (department, snapshot_id, employees, high_risk, medium_risk, "
+                "mean_probability, mean_impact) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (row.department, snapshot_id, int(row.employees), int(row.high_risk), int(row.medium_risk),
+                     float(row.mean_probability), float(row.mean_impact))
+                    for row in dept.itertuples(index=False)
+                )
+            )
+        logger.info(f"Recorded snapshot {snapshot_id} ({len(frame)} employees) for dataset '{dataset}'")
+        return snapshot_id
+
+    def list_snapshots(self, dataset: str, limit: int = 100) -> list:
+        rows = self._conn().execute(
+            "SELECT id, created_at, filename, employee_count, summary_json FROM snapshots "
+            "WHERE dataset = ? ORDER BY id DESC LIMIT ?",
+            (dataset, limit)
+        ).fetchall()
+        return [
+            {
+                "snapshot_id": r["id"],
+                "created_at": r["created_at"],
+                "filename": r["filename"],
+                "employee_count": r["employee_count"],
+                "summary": json.loads(r["summary_json"]),
+            }
+            for r in rows
+        ]
+
+    def employee_history(self, dataset: str, employee_id: str) -> list:
+        rows = self._conn().execute(
+            "SELECT s.id, s.created_at, e.department, e.probability, e.risk_code, e.impact_score, e.priority_score "
+            "FROM employee_scores e JOIN snapshots s ON s.id = e.snapshot_id "
+            "WHERE e.employee_id = ? AND s.dataset = ? ORDER BY s.id",
+            (employee_id, dataset)
+        ).fetchall()
+        return [
+            {
+                "snapshot_id": r["id"],
+                "created_at": r["created_at"],
+                "department": r["department"],
+                "probability": r["probability"],
+                "risk_label": RISK_LABELS[r["risk_code"]],
+                "impact_score": r["impact_score"],
+                "priority_score": r["priority_score"],
+            }
+            for r in rows
+        ]
+
+    def department_trends(self, dataset: str, department: str = None) -> dict:
+        query = (
+            "SELECT d.department, s.id, s.created_at, d.employees, d.high_risk, d.medium_risk, "
+            "d.mean_probability, d.mean_impact "
+            "FROM department_stats d JOIN snapshots s ON s.id = d.snapshot_id "
+            "WHERE s.dataset = ?"
+        )
+        params = [dataset]
+        if department is not None:
+            query += " AND d.department = ?"
+            params.append(department)
+        query += " ORDER BY d.department, s.id"
+
+        trends = {}
+        for r in self._conn().execute(query, params):
+            trends.setdefault(r["department"], []).append({
+                "snapshot_id": r["id"],
+                "created_at": r["created_at"],
+                "employees": r["employees"],
+                "high_risk": r["high_risk"],
+                "medium_risk": r["medium_risk"],
+                "high_risk_pct": round(100 * r["high_risk"] / r["employees"], 1) if r["employees"] else 0.0,
+                "mean_probability": round(r["mean_probability"], 4),
+                "mean_impact": round(r["mean_impact"], 1),
+            })
+        return trends
+
+
+SNAPSHOTS = SnapshotStore()
@@ -0,0 +1,5 @@
+"""
+Offline load-testing harness for app.main:app.
+
+Run from backend/:  python -m loadtest --help
+"""
@@ -0,0 +1,50 @@
+import argparse
+import json
+from .harness import DEFAULT_MIX, format_report, run_load_test
+
+
+def parse_mix(value: str) -> dict:
+    """'simulate=40,employee=30' -> {'simulate': 40, 'employee': 30}"""
+    mix = {}
+    for part in value.split(","):
+        kind, _, weight = part.partition("=")
+        if kind.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown request kind '{kind}'. Choose from: {', '.join(DEFAULT_MIX)}")
+        mix[kind.strip()] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the HR backend (fake model, stub LLM).")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to drive load (default 30)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client threads (default 16)")
+    parser.add_argument("--rows", type=int, default=1000, help="Employees in the uploaded dataset (default 1000)")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX,
+                        help="Weighted request mix, e.g. 'simulate=40,employee=30,upload=5'")
+    parser.add_argument("--fresh-uploads", action="store_true",
+                        help="Make every upload unique so the parsed-upload cache never hits")
+    parser.add_argument("--model-latency", type=float, default=0.0,
+                        help="Artificial model cost in seconds per scored row")
+    parser.add_argument("--llm-delay", type=float, default=0.05, help="Stub LLM response delay in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    report = run_load_test(
+        duration=args.duration,
+        concurrency=args.concurrency,
+        rows=args.rows,
+        mix=args.mix,
+        fresh_uploads=args.fresh_uploads,
+        model_seconds_per_row=args.model_latency,
+        llm_delay=args.llm_delay,
+        seed=args.seed,
+    )
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
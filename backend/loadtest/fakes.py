@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+import numpy as np
+import pandas as pd
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEPARTMENTS = ["Sales", "Research & Development", "Human Resources"]
+
+
+class FakeEnsembleModel:
+    """
+    Deterministic stand-in for Ensemble_Model.pkl.
+    Risk rises with overtime and commute and falls with income and tenure,
+    so every risk band and the simulator's salary effect are exercised.
+    `seconds_per_row` adds artificial scoring cost to mimic a heavier model.
+    """
+
+    def __init__(self, seconds_per_row: float = 0.0):
+        self.seconds_per_row = seconds_per_row
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        if self.seconds_per_row:
+            time.sleep(self.seconds_per_row * len(X))
+
+        def col(name, default):
+            if name not in X:
+                return np.full(len(X), default, dtype=float)
+            return pd.to_numeric(X[name], errors='coerce').fillna(default).to_numpy(float)
+
+        overtime = (X['OverTime'] == 'Yes').to_numpy(float) if 'OverTime' in X else np.zeros(len(X))
+        logit = (
+            1.5
+            - 0.0004 * col('MonthlyIncome', 5000)
+            - 0.15 * col('YearsAtCompany', 5)
+            + 1.2 * overtime
+            + 0.05 * col('DistanceFromHome', 5)
+        )
+        p = 1 / (1 + np.exp(-logit))
+        return np.column_stack([1 - p, p])
+
+
+def make_dataset(rows: int, seed: int = 7) -> pd.DataFrame:
+    """Synthetic HR export with the columns the backend reads."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "EmployeeID": [f"E{i:06d}" for i in range(rows)],
+        "Name": [f"Employee {i}" for i in range(rows)],
+        "Department": rng.choice(DEPARTMENTS, rows),
+        "MonthlyIncome": rng.integers(1500, 20000, rows),
+        "TotalWorkingYears": rng.integers(0, 40, rows),
+        "YearsAtCompany": rng.integers(0, 20, rows),
+        "PerformanceRating": rng.integers(1, 5, rows),
+        "OverTime": rng.choice(["Yes", "No"], rows, p=[0.3, 0.7]),
+        "DistanceFromHome": rng.integers(1, 30, rows),
+        "WorkLifeBalance": rng.integers(1, 5, rows),
+    })
+
+
+STUB_REPLY = "Stub answer for load testing."
+
+
+class StubLLMServer:
+    """
+    Minimal OpenAI/Groq-compatible chat completions endpoint on localhost,
+    so ChatAgent can run without network access. `delay` simulates LLM latency.
+    """
+
+    def __init__(self, delay: float = 0.05, host: str = "127.0.0.1"):
+        delay_s = delay
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                time.sleep(delay_s)
+                body = json.dumps({
+                    "id": "stub-completion",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "stub"),
+                    "choices": [{
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": STUB_REPLY}
+                    }],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, 0), Handler)
+        self.url = f"http://{host}:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def start(self) -> "StubLLMServer":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
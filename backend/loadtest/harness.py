@@ -0,0 +1,238 @@
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+import httpx
+import numpy as np
+
+from .fakes import STUB_REPLY, make_dataset
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API = "/api/v1"
+
+# Relative weights of each request type in the mixed workload
+DEFAULT_MIX = {
+    "simulate": 40,
+    "employee": 30,
+    "summary": 15,
+    "sweep": 5,
+    "chat": 5,
+    "upload": 5,
+}
+
+
+class Workload:
+    """Builds one request of each kind against the seeded dataset."""
+
+    def __init__(self, rows: int, fresh_uploads: bool):
+        self.df = make_dataset(rows)
+        self.ids = self.df["EmployeeID"].tolist()
+        self.csv = self.df.to_csv(index=False).encode()
+        self.fresh_uploads = fresh_uploads
+        self._upload_seq = 0
+        self._lock = threading.Lock()
+
+    def upload_payload(self) -> bytes:
+        if not self.fresh_uploads:
+            return self.csv  # Identical bytes -> served from the parsed-upload cache
+        with self._lock:
+            self._upload_seq += 1
+            seq = self._upload_seq
+        # A unique trailing row defeats the content-hash cache
+        return self.csv + f"LT{seq:06d},Load {seq},Sales,5000,5,2,3,No,5,3\n".encode()
+
+    def send(self, kind: str, client: httpx.Client, rng: random.Random) -> httpx.Response:
+        emp_id = rng.choice(self.ids)
+        if kind == "simulate":
+            changes = {"MonthlyIncome": rng.randint(3000, 20000), "Promotion": rng.random() < 0.5}
+            return client.post(f"{API}/simulate", json={"employee_id": emp_id, "changes": changes})
+        if kind == "employee":
+            return client.get(f"{API}/employees/{emp_id}")
+        if kind == "summary":
+            return client.get(f"{API}/dashboard/summary")
+        if kind == "sweep":
+            body = {"employee_id": emp_id, "min_income": 2000, "max_income": 20000, "steps": 50, "all_combinations": True}
+            return client.post(f"{API}/simulate/sweep", json=body)
+        if kind == "chat":
+            return client.post(f"{API}/chat", json={"message": "Who is most at risk?", "history": []})
+        if kind == "upload":
+            files = {"file": ("loadtest.csv", self.upload_payload(), "text/csv")}
+            return client.post(f"{API}/upload", files=files)
+        raise ValueError(f"Unknown request kind: {kind}")
+
+
+def _status(kind: str, response: httpx.Response) -> int:
+    """
+    HTTP status, except that a chat reply not coming from the stub LLM counts
+    as a failure: ChatAgent answers 200 with an apology when the LLM call fails.
+    """
+    if kind == "chat" and response.status_code == 200:
+        try:
+            if response.json().get("response") != STUB_REPLY:
+                return 502
+        except ValueError:
+            return 502
+    return response.status_code
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_server(port: int, work_dir: str, model_seconds_per_row: float, llm_delay: float) -> subprocess.Popen:
+    """
+    Starts `python -m loadtest.serve` in its own process, so server and client
+    threads do not contend for one GIL, and waits until it answers.
+    """
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [BACKEND_DIR, os.environ.get("PYTHONPATH")])),
+        # Keep load-test uploads out of the real upload cache and history
+        "UPLOAD_CACHE_DIR": os.path.join(work_dir, "cache"),
+        "SNAPSHOT_DB_PATH": os.path.join(work_dir, "snapshots.db"),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "loadtest.serve", "--port", str(port),
+         "--model-latency", str(model_seconds_per_row), "--llm-delay", str(llm_delay)],
+        cwd=BACKEND_DIR, env=env
+    )
+    deadline = time.time() + 30
+    while True:
+        if server.poll() is not None:
+            raise RuntimeError(f"Load-test server exited with code {server.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        if time.time() > deadline:
+            _stop_server(server)
+            raise RuntimeError("Load-test server did not start within 30s")
+        time.sleep(0.1)
+
+
+def _stop_server(server: subprocess.Popen):
+    server.terminate()
+    try:
+        server.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+def run_load_test(
+    duration: float = 30.0,
+    concurrency: int = 16,
+    rows: int = 1000,
+    mix: dict = None,
+    fresh_uploads: bool = False,
+    model_seconds_per_row: float = 0.0,
+    llm_delay: float = 0.05,
+    seed: int = 0,
+) -> dict:
+    """
+    Starts the app in a separate process with a fake model and stub LLM,
+    drives a weighted mix of requests from `concurrency` client threads for
+    `duration` seconds and returns per-endpoint latency/throughput stats.
+    """
+    mix = mix or DEFAULT_MIX
+    kinds = [k for k, w in mix.items() if w > 0]
+    weights = [mix[k] for k in kinds]
+
+    # httpx logs every request at INFO; that would dominate the output
+    root_logger = logging.getLogger()
+    previous_level = root_logger.level
+    root_logger.setLevel(logging.ERROR)
+
+    samples = defaultdict(list)  # kind -> [(status, latency_s)]
+    samples_lock = threading.Lock()
+    work_dir = tempfile.TemporaryDirectory()
+    server = None
+
+    try:
+        port = _free_port()
+        server = _start_server(port, work_dir.name, model_seconds_per_row, llm_delay)
+        base_url = f"http://127.0.0.1:{port}"
+        workload = Workload(rows, fresh_uploads)
+
+        # Get a server-issued session and seed it so reads have data (not measured)
+        with httpx.Client(base_url=base_url, timeout=300) as client:
+            session = client.post(f"{API}/session")
+            session.raise_for_status()
+            session_headers = {"X-Session-ID": session.json()["session_id"]}
+            client.headers.update(session_headers)
+            workload.send("upload", client, random.Random(seed)).raise_for_status()
+
+        deadline = time.perf_counter() + duration
+
+        def worker(worker_id: int):
+            rng = random.Random(seed * 1000 + worker_id)
+            local = []
+            with httpx.Client(base_url=base_url, headers=session_headers, timeout=300) as client:
+                while time.perf_counter() < deadline:
+                    kind = rng.choices(kinds, weights)[0]
+                    start = time.perf_counter()
+                    try:
+                        status = _status(kind, workload.send(kind, client, rng))
+                    except httpx.HTTPError:
+                        status = 0
+                    local.append((kind, status, time.perf_counter() - start))
+            with samples_lock:
+                for kind, status, latency in local:
+                    samples[kind].append((status, latency))
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        if server is not None:
+            _stop_server(server)
+        work_dir.cleanup()
+        root_logger.setLevel(previous_level)
+
+    return summarize(samples, elapsed)
+
+
+def summarize(samples: dict, elapsed: float) -> dict:
+    """Per-endpoint counts, throughput and p50/p95/p99 latency (ms) of successful requests."""
+    report = {}
+    for kind, entries in sorted(samples.items()):
+        statuses = np.array([s for s, _ in entries])
+        latencies = np.array([l for _, l in entries]) * 1000
+        ok = (statuses >= 200) & (statuses < 300)
+        ok_latencies = latencies[ok]
+        p50, p95, p99 = np.percentile(ok_latencies, [50, 95, 99]) if ok.any() else (np.nan,) * 3
+        report[kind] = {
+            "requests": int(len(entries)),
+            "ok": int(ok.sum()),
+            "rejected": int((statuses == 429).sum()),
+            "errors": int((~ok & (statuses != 429)).sum()),
+            "throughput_rps": round(ok.sum() / elapsed, 2) if elapsed else 0.0,
+            "p50_ms": round(float(p50), 1),
+            "p95_ms": round(float(p95), 1),
+            "p99_ms": round(float(p99), 1),
+        }
+    return {"elapsed_s": round(elapsed, 2), "endpoints": report}
+
+
+def format_report(report: dict) -> str:
+    header = f"{'endpoint':<10}{'requests':>10}{'ok':>8}{'429':>6}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    lines = [f"Elapsed: {report['elapsed_s']}s", header, "-" * len(header)]
+    for kind, r in report["endpoints"].items():
+        lines.append(
+            f"{kind:<10}{r['requests']:>10}{r['ok']:>8}{r['rejected']:>6}{r['errors']:>8}"
+            f"{r['throughput_rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}"
+        )
+    return "\n".join(lines)
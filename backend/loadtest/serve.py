@@ -0,0 +1,39 @@
+import argparse
+import logging
+import uvicorn
+from groq import Groq
+
+from app.main import app
+from app.agents.chat_agent import ChatAgent
+from app.agents.risk_agent import RiskAgent
+from .fakes import FakeEnsembleModel, StubLLMServer
+
+
+def main():
+    """
+    Serves the app with the fake model and stub LLM. The harness runs this in
+    its own process so the server does not share a GIL with the client threads;
+    it points UPLOAD_CACHE_DIR / SNAPSHOT_DB_PATH at a temporary directory.
+    """
+    parser = argparse.ArgumentParser(description="Serve the HR backend with a fake model and stub LLM.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--model-latency", type=float, default=0.0,
+                        help="Artificial model cost in seconds per scored row")
+    parser.add_argument("--llm-delay", type=float, default=0.05, help="Stub LLM response delay in seconds")
+    args = parser.parse_args()
+
+    # The agents log per row/request at INFO; that would dominate the measurement
+    logging.getLogger().setLevel(logging.ERROR)
+
+    RiskAgent._model = FakeEnsembleModel(seconds_per_row=args.model_latency)
+    llm = StubLLMServer(delay=args.llm_delay).start()
+    ChatAgent._client = Groq(api_key="loadtest", base_url=llm.url, max_retries=0)
+    try:
+        uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+    finally:
+        llm.stop()
+
+
+if __name__ == "__main__":
+    main()
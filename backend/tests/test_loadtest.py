@@ -0,0 +1,39 @@
+import logging
+from app.agents.chat_agent import ChatAgent
+from app.agents.risk_agent import RiskAgent
+from app.services import ingestion
+from loadtest.fakes import FakeEnsembleModel, make_dataset
+from loadtest.harness import run_load_test
+
+def test_fake_model_is_deterministic_and_spans_risk_bands():
+    df = make_dataset(500)
+    probs = FakeEnsembleModel().predict_proba(df)[:, 1]
+    assert (probs == FakeEnsembleModel().predict_proba(make_dataset(500))[:, 1]).all()
+    assert set(RiskAgent.label_codes(probs)) == {0, 1, 2}
+
+def test_load_test_smoke():
+    from app.api import routes
+    before = (RiskAgent._model, ChatAgent._client, routes.SESSIONS, routes.SNAPSHOTS,
+              ingestion.CACHE_DIR, logging.getLogger().level)
+    report = run_load_test(duration=1, concurrency=2, rows=50, llm_delay=0, mix={"simulate": 3, "chat": 1})
+    endpoints = report["endpoints"]
+    # Fakes, stores, cache dir and log level are all put back
+    after = (RiskAgent._model, ChatAgent._client, routes.SESSIONS, routes.SNAPSHOTS,
+             ingestion.CACHE_DIR, logging.getLogger().level)
+    assert after == before
+    # Chat replies must come from the stub LLM, not ChatAgent's fallback apology
+    assert endpoints["chat"]["ok"] > 0
+    assert endpoints["chat"]["errors"] == 0
+    assert endpoints["simulate"]["ok"] > 0
+    assert endpoints["simulate"]["errors"] == 0
+    assert endpoints["simulate"]["p50_ms"] <= endpoints["simulate"]["p99_ms"]
+
+def test_chat_fallback_reply_counts_as_error():
+    import httpx
+    from loadtest.fakes import STUB_REPLY
+    from loadtest.harness import _status
+
+    apology = httpx.Response(200, json={"response": "I apologize, but I'm having trouble connecting..."})
+    assert _status("chat", apology) == 502
+    assert _status("chat", httpx.Response(200, json={"response": STUB_REPLY})) == 200
+    assert _status("employee", httpx.Response(404)) == 404
@@ -0,0 +1,263 @@
+import io
+import os
+import pytest
+import pandas as pd
+from app.services import ingestion
+from app.services.admission import AdmissionGate
+from app.services.session_store import (
+    SessionStore, SessionCapacityError, issue_session_token, verify_session_token
+)
+
+CSV = b"Employee ID,Salary,Department,Unused\nE1,4000,Sales,x\nE2,9000,R&D,y\n"
+
+def test_upload_cache_skips_reparse(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, "CACHE_DIR", str(tmp_path))
+    first = ingestion.load_upload(CSV, "hr.csv")
+    assert len(list(tmp_path.iterdir())) == 1
+
+    # Second upload of identical bytes must come from the cache, not the parser
+    monkeypatch.setattr(pd, "read_csv", lambda *a, **k: (_ for _ in ()).throw(AssertionError("parsed")))
+    second = ingestion.load_upload(CSV, "hr.csv")
+    pd.testing.assert_frame_equal(first, second)
+
+def test_upload_reads_only_needed_columns(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, "CACHE_DIR", str(tmp_path))
+    df = ingestion.load_upload(CSV, "hr.csv", feature_names=["MonthlyIncome"])
+    assert list(df.columns) == ["Employee ID", "Salary", "Department"]
+
+def test_upload_cache_key_tracks_column_selection(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingestion, "CACHE_DIR", str(tmp_path))
+    ingestion.load_upload(CSV, "hr.csv", feature_names=["MonthlyIncome"])
+    # A deploy that changes which columns are kept must not be served the old subset
+    monkeypatch.setattr(ingestion, "BASE_COLUMNS", ingestion.BASE_COLUMNS | {"Unused"})
+    df = ingestion.load_upload(CSV, "hr.csv", feature_names=["MonthlyIncome"])
+    assert "Unused" in df.columns
+    assert len(list(tmp_path.iterdir())) == 2
+
+def test_upload_excel_reads_only_needed_columns(tmp_path, monkeypatch):
+    pytest.importorskip("openpyxl")  # Writing the fixture; reading uses calamine when installed
+    monkeypatch.setattr(ingestion, "CACHE_DIR", str(tmp_path))
+    buf = io.BytesIO()
+    pd.read_csv(io.BytesIO(CSV)).to_excel(buf, index=False)
+    df = ingestion.load_upload(buf.getvalue(), "hr.xlsx", feature_names=["MonthlyIncome"])
+    assert list(df.columns) == ["Employee ID", "Salary", "Department"]
+    assert df["Salary"].tolist() == [4000, 9000]
+
+def test_upload_cache_parquet_round_trip(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(ingestion, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(ingestion, "_HAS_PYARROW", True)
+    first = ingestion.load_upload(CSV, "hr.csv")
+    assert [p.suffix for p in tmp_path.iterdir()] == [".parquet"]
+
+    monkeypatch.setattr(pd, "read_csv", lambda *a, **k: (_ for _ in ()).throw(AssertionError("parsed")))
+    pd.testing.assert_frame_equal(first, ingestion.load_upload(CSV, "hr.csv"))
+
+def test_session_snapshots_are_isolated_and_swapped():
+    store = SessionStore(max_sessions=2)
+    store.publish("a", [{"EmployeeID": "E1"}], {"total_employees": 1})
+    before = store.get("a")
+
+    store.publish("a", [{"EmployeeID": "E2"}], {"total_employees": 1})
+    # A reader holding the old snapshot keeps a consistent view
+    assert list(before.by_id) == ["E1"]
+    assert list(store.get("a").by_id) == ["E2"]
+    assert store.get("b").employees == ()
+
+def test_session_store_never_evicts_active_sessions():
+    store = SessionStore(max_sessions=2, idle_ttl=3600)
+    store.publish("a", [{"EmployeeID": "E1"}], {})
+    store.publish("b", [], {})
+    with pytest.raises(SessionCapacityError):
+        store.publish("c", [], {})
+    assert list(store.get("a").by_id) == ["E1"]
+
+    # Idle sessions make room for new ones
+    store.idle_ttl = 0
+    store.publish("c", [], {})
+    assert store.get("a").employees == ()
+
+def test_full_store_refuses_upload_before_scoring(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.api import routes
+
+    store = SessionStore(max_sessions=1)
+    store.publish("other", [], {})
+    assert store.ensure_capacity("other") is None  # Existing sessions can always re-upload
+    with pytest.raises(SessionCapacityError):
+        store.ensure_capacity("new")
+
+    monkeypatch.setattr(routes, "SESSIONS", store)
+    monkeypatch.setattr(routes, "_process_upload", lambda *a: pytest.fail("upload was scored"))
+    response = TestClient(app).post(
+        "/api/v1/upload", files={"file": ("hr.csv", CSV, "text/csv")},
+        headers={"X-Session-ID": issue_session_token()}
+    )
+    assert response.status_code == 503
+
+def test_session_tokens_are_server_signed():
+    token = issue_session_token()
+    assert verify_session_token(token)
+    assert not verify_session_token("default")
+    assert not verify_session_token(token.split(".")[0] + ".forged")
+    assert not verify_session_token("abc.\u00e9\u00e9")
+
+def test_non_ascii_session_header_is_unauthorized():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    response = TestClient(app).get("/api/v1/dashboard/summary", headers={"X-Session-ID": "abc.\u00e9\u00e9".encode("latin-1")})
+    assert response.status_code == 401
+
+def test_admission_gate_rejects_when_full():
+    gate = AdmissionGate("upload", 1)
+    assert gate.try_enter()
+    assert not gate.try_enter()
+    gate.leave()
+    assert gate.try_enter()
+
+def _scored(emp_id, dept, prob):
+    return {"EmployeeID": emp_id, "Department": dept, "Risk": {"Label": "", "Probability": prob},
+            "Impact": {"score": 50.0}, "PriorityScore": 40.0}
+
+def test_snapshot_history_and_trends(tmp_path):
+    from app.services.snapshot_store import SnapshotStore
+    store = SnapshotStore(str(tmp_path / "history.db"))
+    store.record("acme", "jan.csv", [_scored("E1", "Sales", 0.8), _scored("E2", "Sales", 0.2)], {"total_employees": 2})
+    store.record("acme", "feb.csv", [_scored("E1", "Sales", 0.5), _scored("E2", "Sales", 0.3)], {"total_employees": 2})
+    store.record("other", "x.csv", [_scored("E1", "Sales", 0.9)], {})
+
+    history = store.employee_history("acme", "E1")
+    assert [h["risk_label"] for h in history] == ["High Risk", "Medium Risk"]
+
+    sales = store.department_trends("acme", "Sales")["Sales"]
+    assert [p["high_risk"] for p in sales] == [1, 0]
+    assert sales[0]["high_risk_pct"] == 50.0
+    assert [s["filename"] for s in store.list_snapshots("acme")] == ["feb.csv", "jan.csv"]
+
+def test_history_outlives_the_session_that_uploaded(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.api import routes
+    from app.agents.risk_agent import RiskAgent
+    from app.services.snapshot_store import SnapshotStore
+    from loadtest.fakes import FakeEnsembleModel, make_dataset
+
+    monkeypatch.setattr(RiskAgent, "_model", FakeEnsembleModel())
+    monkeypatch.setattr(ingestion, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(routes, "SESSIONS", SessionStore())
+    monkeypatch.setattr(routes, "SNAPSHOTS", SnapshotStore(str(tmp_path / "history.db")))
+    client = TestClient(app)
+    upload = {"file": ("hr.csv", make_dataset(5).to_csv(index=False).encode(), "text/csv")}
+
+    response = client.post("/api/v1/upload", files=upload, data={"dataset": "acme"},
+                           headers={"X-Session-ID": issue_session_token()})
+    assert response.status_code == 200
+
+    # A different browser (or the same one after a restart) sees the same history
+    other = {"X-Session-ID": issue_session_token()}
+    snapshots = client.get("/api/v1/history/snapshots", params={"dataset": "acme"}, headers=other).json()
+    assert [s["filename"] for s in snapshots] == ["hr.csv"]
+    assert client.get("/api/v1/history/snapshots", headers=other).json() == []
+    assert client.get("/api/v1/history/snapshots", params={"dataset": "../x"}, headers=other).status_code == 422
+
+def test_profiling_writes_artifact_only_when_requested(tmp_path, monkeypatch):
+    from app.services import profiling
+    monkeypatch.setattr(profiling, "PROFILES_DIR", str(tmp_path))
+
+    assert profiling.run_profiled(None, sum, [1, 2]) == (3, None)
+    assert list(tmp_path.iterdir()) == []
+
+    req_id = profiling.request_id("../upload 42")
+    assert req_id == "___upload_42"
+    result, path = profiling.run_profiled(req_id, sum, [1, 2])
+    assert result == 3
+    assert path == profiling.artifact_path(req_id)
+    assert os.path.exists(path)
+
+def test_profiles_are_never_overwritten_and_capped(tmp_path, monkeypatch):
+    from app.services import profiling
+    monkeypatch.setattr(profiling, "PROFILES_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PROFILES_MAX_FILES", 2)
+
+    first = profiling.run_profiled("same", sum, [1])[1]
+    second = profiling.run_profiled("same", sum, [1])[1]
+    assert first == profiling.artifact_path("same")
+    assert second == profiling.artifact_path("same", 1)
+
+    profiling.run_profiled("other", sum, [1])
+    assert len(list(tmp_path.iterdir())) == 2
+
+def test_profile_flag_parsing():
+    from app.services.profiling import is_truthy
+    assert all(is_truthy(v) for v in ("1", "true", "TRUE", "yes", "on"))
+    assert not any(is_truthy(v) for v in ("0", "false", "no", "", None))
+
+def test_profiling_failures_never_break_the_request(tmp_path, monkeypatch):
+    from app.services import profiling
+    # Artifact directory cannot be created: the result is still returned
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    monkeypatch.setattr(profiling, "PROFILES_DIR", str(blocker / "profiles"))
+    assert profiling.run_profiled("req", sum, [1, 2]) == (3, None)
+
+    # Another request is already being profiled: skip instead of failing
+    monkeypatch.setattr(profiling, "PROFILES_DIR", str(tmp_path))
+    with profiling._ACTIVE:
+        assert profiling.run_profiled("req", sum, [1, 2]) == (3, None)
+    assert not os.path.exists(profiling.artifact_path("req"))
+
+def test_admission_middleware_rejects_before_reading_body():
+    import asyncio
+    from app.services.admission import AdmissionMiddleware
+
+    gate = AdmissionGate("upload", 1)
+    calls = []
+
+    async def downstream(scope, receive, send):
+        calls.append(scope["path"])
+
+    async def receive():
+        raise AssertionError("request body was read")
+
+    sent = []
+    async def send(message):
+        sent.append(message)
+
+    middleware = AdmissionMiddleware(downstream, {("POST", "/api/v1/upload"): gate})
+    scope = {"type": "http", "method": "POST", "path": "/api/v1/upload", "headers": []}
+
+    assert gate.try_enter()  # Saturate the gate
+    asyncio.run(middleware(scope, receive, send))
+    assert sent[0]["status"] == 429
+    assert calls == []
+
+    gate.leave()
+    asyncio.run(middleware(scope, receive, send))
+    assert calls == ["/api/v1/upload"]
+    assert gate.try_enter()  # Slot released after the request
+
+def test_snapshot_deduplicates_employee_ids(tmp_path):
+    from app.services.snapshot_store import SnapshotStore
+    store = SnapshotStore(str(tmp_path / "history.db"))
+    store.record("s1", "dup.csv", [_scored("E1", "Sales", 0.8), _scored("E1", "Sales", 0.2)], {})
+
+    assert store.list_snapshots("s1")[0]["employee_count"] == 1
+    assert store.department_trends("s1")["Sales"][0]["employees"] == 1
+    assert [h["risk_label"] for h in store.employee_history("s1", "E1")] == ["Low Risk"]
+
+
+def test_sweep_rejects_unknown_or_non_boolean_actions():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    headers = {"X-Session-ID": issue_session_token()}
+    body = {"employee_id": "E1", "min_income": 2000, "max_income": 6000}
+
+    response = client.post("/api/v1/simulate/sweep", json={**body, "actions": [{"Promtion": True}]}, headers=headers)
+    assert response.status_code == 400
+    assert "Promtion" in response.json()["detail"]
+    response = client.post("/api/v1/simulate/sweep", json={**body, "actions": [{"Promotion": "maybe"}]}, headers=headers)
+    assert response.status_code == 422
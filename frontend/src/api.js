@@ -4,6 +4,42 @@ const api = axios.create({
     baseURL: 'http://localhost:8000/api/v1', // FastAPI URL
 });
 
+// Each browser gets its own server-issued session, so datasets are not shared
+const SESSION_KEY = 'hr_session_id';
+let sessionRequest = null;
+
+const getSessionId = async () => {
+    const stored = localStorage.getItem(SESSION_KEY);
+    if (stored) return stored;
+    if (!sessionRequest) {
+        sessionRequest = api.post('/session')
+            .then((response) => {
+                localStorage.setItem(SESSION_KEY, response.data.session_id);
+                return response.data.session_id;
+            })
+            .finally(() => { sessionRequest = null; });
+    }
+    return sessionRequest;
+};
+
+api.interceptors.request.use(async (config) => {
+    if (config.url !== '/session') {
+        config.headers['X-Session-ID'] = await getSessionId();
+    }
+    return config;
+});
+
+// A session the server no longer accepts (e.g. rotated secret): get a new one and retry once
+api.interceptors.response.use(null, async (error) => {
+    const { config, response } = error;
+    if (response?.status === 401 && config && config.url !== '/session' && !config._sessionRetried) {
+        localStorage.removeItem(SESSION_KEY);
+        config._sessionRetried = true;
+        return api(config);
+    }
+    return Promise.reject(error);
+});
+
 export const uploadFile = async (file) => {
     const formData = new FormData();
     formData.append('file', file);